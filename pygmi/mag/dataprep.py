@@ -30,6 +30,7 @@ import numpy as np
 from scipy.signal import tukey
 import scipy.interpolate as si
 import scipy.signal as signal
+from scipy.spatial import Delaunay
 import pygmi.menu_default as menu_default
 from pygmi.raster.datatypes import Data
 
@@ -511,16 +512,17 @@ class RTP(QtWidgets.QDialog):
         D_deg = self.dsb_dec.value()
 
         newdat = []
+        tricache = {}
         for data in self.piter(self.indata['Raster']):
             if data.dataid != self.dataid.currentText():
                 continue
-            dat = rtp(data, I_deg, D_deg)
+            dat = rtp(data, I_deg, D_deg, tricache)
             newdat.append(dat)
 
         self.outdata['Raster'] = newdat
 
 
-def fftprep(data):
+def fftprep(data, tricache=None):
     """
     FFT preparation.
 
@@ -528,8 +530,8 @@ def fftprep(data):
     ----------
     data : TYPE
         DESCRIPTION.
-    dxy : TYPE
-        DESCRIPTION.
+    tricache : dictionary, optional
+        Triangulation cache, see _delaunay. The default is None.
 
     Returns
     -------
@@ -548,7 +550,7 @@ def fftprep(data):
     nr, nc = data.data.shape
 
     z1 = np.zeros((nr+2*rdiff, nc+2*cdiff))-999
-    x1, y1 = np.mgrid[0: nr+2*rdiff, 0: nc+2*cdiff]
+    x1, y1 = np.ogrid[0: nr+2*rdiff, 0: nc+2*cdiff]
     z1[rdiff:-rdiff, cdiff:-cdiff] = ndat.filled(-999)
 
     z1[0] = 0
@@ -556,17 +558,11 @@ def fftprep(data):
     z1[:, 0] = 0
     z1[:, -1] = 0
 
-    x = x1.flatten()
-    y = y1.flatten()
-    z = z1.flatten()
-
-    x = x[z != -999]
-    y = y[z != -999]
-    z = z[z != -999]
+    filt = (z1 != -999)
+    z = z1[filt]
 
-    points = np.transpose([x, y])
-
-    zfin = si.griddata(points, z, (x1, y1), method='linear')
+    tri = _delaunay(filt, tricache)
+    zfin = si.LinearNDInterpolator(tri, z)(x1, y1)
 
     nr, nc = zfin.shape
     zfin *= tukey(nc)
@@ -575,6 +571,42 @@ def fftprep(data):
     return zfin, rdiff, cdiff, datamedian
 
 
+def _delaunay(filt, tricache=None):
+    """
+    Delaunay triangulation of the valid points in a padded grid.
+
+    The triangulation only depends on which cells hold data. If the caller
+    supplies a tricache dictionary, the last triangulation is kept in it and
+    reused when the same mask is gridded again, e.g. for several bands
+    sharing a mask or repeated RTP runs with different parameters. The
+    cache lives only as long as the caller keeps the dictionary.
+
+    Parameters
+    ----------
+    filt : numpy array
+        Boolean array, True where the padded grid holds data.
+    tricache : dictionary, optional
+        Triangulation cache, keyed on the mask. The default is None, which
+        means no caching.
+
+    Returns
+    -------
+    tri : scipy.spatial.Delaunay
+        Triangulation of the row, column indices of the valid cells.
+
+    """
+    if tricache is None:
+        return Delaunay(np.argwhere(filt))
+
+    key = (filt.shape, filt.tobytes())
+
+    if key not in tricache:
+        tricache.clear()
+        tricache[key] = Delaunay(np.argwhere(filt))
+
+    return tricache[key]
+
+
 def fft_getkxy(fftmod, xdim, ydim):
     """
     Get KX and KY.
@@ -600,7 +632,7 @@ def fft_getkxy(fftmod, xdim, ydim):
     return KX, KY
 
 
-def rtp(data, I_deg, D_deg):
+def rtp(data, I_deg, D_deg, tricache=None):
     """
     Reduction to th epole.
 
@@ -612,6 +644,9 @@ def rtp(data, I_deg, D_deg):
         Magnetic inclination.
     D_deg : float
         Magnetic declination.
+    tricache : dictionary, optional
+        Triangulation cache passed to fftprep, for reuse over repeated
+        calls. The default is None.
 
     Returns
     -------
@@ -622,7 +657,7 @@ def rtp(data, I_deg, D_deg):
     xdim = data.xdim
     ydim = data.ydim
 
-    ndat, rdiff, cdiff, datamedian = fftprep(data)
+    ndat, rdiff, cdiff, datamedian = fftprep(data, tricache)
     fftmod = np.fft.fft2(ndat)
 
     ny, nx = fftmod.shape
@@ -171,20 +171,23 @@ class LithModel():
         zvals = zvals[self.ozrng[0] < zvals]
         zvals = zvals[zvals < self.ozrng[1]]
 
-        for x_i in piter(xvals):
-            o_i = int((x_i - self.oxrng[0]) / self.odxy)
-            i = int((x_i - self.xrange[0]) / self.dxy)
-            for x_j in yvals:
-                o_j = int((x_j - self.oyrng[0]) / self.odxy)
-                j = int((x_j - self.yrange[0]) / self.dxy)
-                for x_k in zvals:
-                    o_k = int((self.ozrng[1] - x_k) / self.od_z)
-                    k = int((self.zrange[1] - x_k) / self.d_z)
-
-                    if (self.lith_index[i, j, k] != -1 and
-                            self.olith_index[o_i, o_j, o_k] != -1) or nodtm:
-                        self.lith_index[i, j, k] = \
-                            self.olith_index[o_i, o_j, o_k]
+        o_i = ((xvals - self.oxrng[0]) / self.odxy).astype(int)
+        i = ((xvals - self.xrange[0]) / self.dxy).astype(int)
+        o_j = ((yvals - self.oyrng[0]) / self.odxy).astype(int)
+        j = ((yvals - self.yrange[0]) / self.dxy).astype(int)
+        o_k = ((self.ozrng[1] - zvals) / self.od_z).astype(int)
+        k = ((self.zrange[1] - zvals) / self.d_z).astype(int)
+
+        jk = np.ix_(j, k)
+        o_jk = np.ix_(o_j, o_k)
+
+        for x_i in piter(range(xvals.size)):
+            cur = self.lith_index[i[x_i]][jk]
+            old = self.olith_index[o_i[x_i]][o_jk]
+
+            filt = ((cur != -1) & (old != -1)) | nodtm
+            cur[filt] = old[filt]
+            self.lith_index[i[x_i]][jk] = cur
 
     def dtm_to_lith(self, pbar=None):
         """
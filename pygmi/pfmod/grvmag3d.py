@@ -44,6 +44,7 @@ from PyQt5 import QtWidgets, QtCore
 import numpy as np
 # from scipy.linalg import norm
 from osgeo import gdal
+import numba
 from numba import jit, prange
 from matplotlib import cm
 import matplotlib as mpl
@@ -456,15 +457,12 @@ class GeoData():
         """
 
         if self.modified is True:
-            numx = self.g_cols*self.g_dxy
             numy = self.g_rows*self.g_dxy
 
 # The 2 lines below ensure that the profile goes over the center of the grid
 # cell
-            xdist = np.arange(self.g_dxy/2, numx+self.g_dxy/2, self.g_dxy,
-                              dtype=float)
-            ydist = np.arange(numy-self.g_dxy/2, -1*self.g_dxy/2,
-                              -1*self.g_dxy, dtype=float)
+            xdist = (np.arange(self.g_cols)+0.5)*self.g_dxy
+            ydist = numy-(np.arange(self.g_rows)+0.5)*self.g_dxy
 
             if hcor is None:
                 hcor2 = 0
@@ -492,15 +490,12 @@ class GeoData():
         """
 
         if self.modified is True:
-            numx = self.g_cols*self.g_dxy
             numy = self.g_rows*self.g_dxy
 
 # The 2 lines below ensure that the profile goes over the center of the grid
 # cell
-            xdist = np.arange(self.g_dxy/2, numx+self.g_dxy/2, self.g_dxy,
-                              dtype=float)
-            ydist = np.arange(numy-self.g_dxy/2, -1*self.g_dxy/2,
-                              -1*self.g_dxy, dtype=float)
+            xdist = (np.arange(self.g_cols)+0.5)*self.g_dxy
+            ydist = numy-(np.arange(self.g_rows)+0.5)*self.g_dxy
 
             self.showtext('   Calculate magnetic origin field')
 
@@ -585,13 +580,12 @@ class GeoData():
         """
         numx = self.g_cols*self.g_dxy
         numy = self.g_rows*self.g_dxy
-        numz = self.numz*self.d_z
         dxy = self.dxy
         d_z = self.d_z
 
         self.x12 = np.array([numx/2-dxy/2, numx/2+dxy/2])
         self.y12 = np.array([numy/2-dxy/2, numy/2+dxy/2])
-        self.z12 = np.arange(-numz, numz+d_z, d_z)
+        self.z12 = np.arange(-self.numz, self.numz+1)*d_z
 
     def gboxmain(self, xobs, yobs, zobs, hcor):
         """
@@ -659,8 +653,7 @@ class GeoData():
             gval = np.zeros([self.g_cols, self.g_rows])
 
             gval = _gbox(gval, xobs, yobs, numx, numy, z_0, x_1, y_1, z1,
-                         x_2, y_2, z2, np.ones(2), np.ones(2), np.ones(2),
-                         np.array([-1, 1]))
+                         x_2, y_2, z2, np.array([-1, 1]))
 
             gval *= 6.6732e-3
             glayers.append(gval)
@@ -732,6 +725,45 @@ class GeoData():
         numx = int(self.g_cols)
         numy = int(self.g_rows)
 
+        mt, (fm1, fm2, fm3, fm4, fm5, fm6) = self.magfactors(demag)
+
+        if zobs == 0:
+            zobs = -0.01
+
+        z1122 = np.append(z1122, [2*z1122[-1]-z1122[-2]])
+
+        for z1 in piter(z1122):
+            if z1 < z1122[hcor]:
+                mlayers.append(np.zeros((self.g_cols, self.g_rows)))
+                continue
+
+            mval = np.zeros([self.g_cols, self.g_rows])
+
+            mval = _mbox(mval, xobs, yobs, numx, numy, z0, x1, y1, z1, x2, y2,
+                         fm1, fm2, fm3, fm4, fm5, fm6)
+
+            mlayers.append(mval)
+
+        self.mlayers = np.array(mlayers) * mt
+        self.mlayers = self.mlayers[:-1]-self.mlayers[1:]
+
+    def magfactors(self, demag=False):
+        """
+        Calculate the magnetisation factors used by the mbox routine.
+
+        Parameters
+        ----------
+        demag : bool, optional
+            Apply a demagnetisation correction. The default is False.
+
+        Returns
+        -------
+        mt : float
+            Total magnetisation.
+        fmag : tuple
+            Six factors combining the magnetisation and field directions.
+
+        """
         ma, mb, mc = dircos(self.minc, self.mdec, self.theta)
         fa, fb, fc = dircos(self.finc, self.fdec, self.theta)
 
@@ -758,25 +790,7 @@ class GeoData():
         fm5 = mb*fb
         fm6 = mc*fc
 
-        if zobs == 0:
-            zobs = -0.01
-
-        z1122 = np.append(z1122, [2*z1122[-1]-z1122[-2]])
-
-        for z1 in piter(z1122):
-            if z1 < z1122[hcor]:
-                mlayers.append(np.zeros((self.g_cols, self.g_rows)))
-                continue
-
-            mval = np.zeros([self.g_cols, self.g_rows])
-
-            mval = _mbox(mval, xobs, yobs, numx, numy, z0, x1, y1, z1, x2, y2,
-                         fm1, fm2, fm3, fm4, fm5, fm6, np.ones(2), np.ones(2))
-
-            mlayers.append(mval)
-
-        self.mlayers = np.array(mlayers) * mt
-        self.mlayers = self.mlayers[:-1]-self.mlayers[1:]
+        return mt, (fm1, fm2, fm3, fm4, fm5, fm6)
 
 
 def calc_demag(mvec, k, dx, dy, dz):
@@ -914,13 +928,16 @@ def gridmatch(lmod, ctxt, rtxt):
 
 
 def calc_field(lmod, pbars=None, showtext=None, parent=None,
-               showreports=False, magcalc=False, demag=False):
+               showreports=False, magcalc=False, demag=False, both=False,
+               dtype=np.float64, jobs=None):
     """
     Calculate magnetic and gravity field.
 
     This function calculates the magnetic and gravity field. It has two
     different modes of operation, by using the magcalc switch. If magcalc=True
     then magnetic fields are calculated, otherwise only gravity is calculated.
+    If both=True, gravity and magnetic fields are summed together in a single
+    pass over the model.
 
     Parameters
     ----------
@@ -934,6 +951,25 @@ def calc_field(lmod, pbars=None, showtext=None, parent=None,
         show extra reports
     magcalc : bool
         if True, calculates magnetic data, otherwise only gravity.
+    demag : bool
+        if True, applies a demagnetisation correction.
+    both : bool
+        if True, calculates gravity and magnetic data together. magcalc is
+        ignored.
+    dtype : numpy dtype
+        precision of the layer fields used in the summation. np.float32
+        halves the memory traffic of the summation, but the layer values then
+        carry only about 7 significant digits. The layers are calculated in
+        float64, so np.float32 copies them when cast and briefly raises peak
+        memory rather than lowering it. With np.float64 a single field's
+        layers are used without a copy, while both=True stacks the gravity
+        and magnetic layers into one new array. Sums are always accumulated
+        and returned as float64.
+    jobs : int or None
+        number of threads used for the calculation. None keeps numba's
+        current thread setting (numba.get_num_threads), 1 runs serially, and
+        values below 1 use all threads available to numba. Values above the
+        available threads are clipped.
 
     Returns
     -------
@@ -941,6 +977,18 @@ def calc_field(lmod, pbars=None, showtext=None, parent=None,
         dictionary of items of type Data.
     """
 
+    if jobs is not None:
+        oldjobs = numba.get_num_threads()
+        if jobs < 1:
+            jobs = numba.config.NUMBA_NUM_THREADS
+        jobs = min(jobs, numba.config.NUMBA_NUM_THREADS)
+        numba.set_num_threads(jobs)
+        try:
+            return calc_field(lmod, pbars, showtext, parent, showreports,
+                              magcalc, demag, both, dtype)
+        finally:
+            numba.set_num_threads(oldjobs)
+
     if showtext is None:
         showtext = print
     if pbars is not None:
@@ -952,6 +1000,21 @@ def calc_field(lmod, pbars=None, showtext=None, parent=None,
         showtext('Error: Create a model first')
         return None
 
+# A single pass needs both fields to have been calculated on the same model.
+    if both and not np.array_equal(lmod.lith_index_grv_old,
+                                   lmod.lith_index_mag_old):
+        calc_field(lmod, pbars, showtext, parent, showreports, False, demag,
+                   dtype=dtype)
+        return calc_field(lmod, pbars, showtext, parent, showreports, True,
+                          demag, dtype=dtype)
+
+    if both:
+        dnames = ['Calculated Gravity', 'Calculated Magnetics']
+    elif magcalc:
+        dnames = ['Calculated Magnetics']
+    else:
+        dnames = ['Calculated Gravity']
+
     ttt = PTime()
     # Init some variables for convenience
     lmod.update_lithlist()
@@ -964,7 +1027,7 @@ def calc_field(lmod, pbars=None, showtext=None, parent=None,
 
 # model index
     modind = lmod.lith_index.copy()
-    if magcalc:
+    if magcalc and not both:
         modindcheck = lmod.lith_index_mag_old.copy()
     else:
         modindcheck = lmod.lith_index_grv_old.copy()
@@ -1003,9 +1066,10 @@ def calc_field(lmod, pbars=None, showtext=None, parent=None,
                 mlist[1].parent = parent
                 mlist[1].pbars = parent.pbars
                 mlist[1].showtext = parent.showtext
-            if magcalc:
+            if 'Calculated Magnetics' in dnames:
                 mlist[1].calc_origin_mag(hcor, demag)
-            else:
+            if 'Calculated Gravity' in dnames:
+                mlist[1].modified = True
                 mlist[1].calc_origin_grav()
             tmpfiles[mlist[0]] = save_layer(mlist)
         lmod.tmpfiles = tmpfiles
@@ -1021,11 +1085,9 @@ def calc_field(lmod, pbars=None, showtext=None, parent=None,
         pbars.resetsub(maximum=(len(lmod.lith_list)-1))
         piter = pbars.iter
 
-    mgvalin = np.zeros(numx*numy)
-    mgval = np.zeros(numx*numy)
+    mgvalin = np.zeros([len(dnames), numx*numy])
 
     hcorflat = numz-hcor.flatten()
-    aaa = np.reshape(np.mgrid[0:numx, 0:numy], [2, numx*numy])
 
     for mlist in piter(lmod.lith_list.items()):
         if mlist[0] == 'Background':
@@ -1037,33 +1099,35 @@ def calc_field(lmod, pbars=None, showtext=None, parent=None,
 
         mfile = np.load(lmod.tmpfiles[mlist[0]])
 
-        if magcalc:
-            mglayers = mfile['mlayers']
+        mglayers = []
+        if 'Calculated Gravity' in dnames:
+            mglayers.append(mfile['glayers']*mlist[1].rho())
+        if 'Calculated Magnetics' in dnames:
+            mglayers.append(mfile['mlayers'])
+        if len(mglayers) == 1:
+            mglayers = np.asarray(mglayers[0], dtype=dtype)[np.newaxis]
         else:
-            mglayers = mfile['glayers']*mlist[1].rho()
+# The magnetic layers have one extra layer below the model, which is not used
+            numlayers = min(len(i) for i in mglayers)
+            mglayers = np.array([i[:numlayers] for i in mglayers],
+                                dtype=dtype)
 
         showtext('Summing '+mlist[0]+' (PyGMI may become non-responsive' +
                  ' during this calculation)')
 
         if modindmax > -1 and mijk in modind:
             QtWidgets.QApplication.processEvents()
-            _, _, k = np.nonzero(modind == mijk)
-            kuni = np.array(np.unique(k), dtype=np.int32)
+            isrc, jsrc, ksrc = np.nonzero(modind == mijk)
 
-            for k in kuni:
-                baba = sum_fields(k, mgval, numx, numy, modind, aaa[0], aaa[1],
-                                  mglayers, hcorflat, mijk)
-                mgvalin += baba
+            sum_fields(mgvalin, numx, numy, isrc, jsrc, ksrc, mglayers,
+                       hcorflat, 1.)
 
         if modindcheckmax > -1 and mijk in modindcheck:
             QtWidgets.QApplication.processEvents()
-            _, _, k = np.nonzero(modindcheck == mijk)
-            kuni = np.array(np.unique(k), dtype=np.int32)
+            isrc, jsrc, ksrc = np.nonzero(modindcheck == mijk)
 
-            for k in kuni:
-                baba = sum_fields(k, mgval, numx, numy, modindcheck, aaa[0],
-                                  aaa[1], mglayers, hcorflat, mijk)
-                mgvalin -= baba
+            sum_fields(mgvalin, numx, numy, isrc, jsrc, ksrc, mglayers,
+                       hcorflat, -1.)
 
         showtext('Done')
 
@@ -1074,24 +1138,20 @@ def calc_field(lmod, pbars=None, showtext=None, parent=None,
     for i in lmod.tmpfiles:
         lmod.tmpfiles[i].close()
 
-    mgvalin.resize([numx, numy])
-    mgvalin = mgvalin.T
-    mgvalin = mgvalin[::-1]
-    mgvalin = np.ma.array(mgvalin)
+    for mgvaltmp, dname in zip(mgvalin, dnames):
+        mgvaltmp = mgvaltmp.reshape([numx, numy])
+        mgvaltmp = mgvaltmp.T
+        mgvaltmp = mgvaltmp[::-1]
+        mgvaltmp = np.ma.array(mgvaltmp)
 
-#    if np.unique(modindcheck).size > 1:
-    if modindcheckmax > -1:
-        if magcalc:
-            mgvalin += lmod.griddata['Calculated Magnetics'].data
-        else:
-            mgvalin += lmod.griddata['Calculated Gravity'].data
+#        if np.unique(modindcheck).size > 1:
+        if modindcheckmax > -1:
+            mgvaltmp += lmod.griddata[dname].data
 
-    if magcalc:
-        lmod.griddata['Calculated Magnetics'].data = mgvalin
-    else:
-        lmod.griddata['Calculated Gravity'].data = mgvalin
+        lmod.griddata[dname].data = mgvaltmp
 
-    if ('Gravity Regional' in lmod.griddata and not magcalc and
+    if ('Gravity Regional' in lmod.griddata and
+            'Calculated Gravity' in dnames and
             np.unique(modindcheck).size == 1):
         zfin = gridmatch(lmod, 'Calculated Gravity', 'Gravity Regional')
         lmod.griddata['Calculated Gravity'].data += zfin
@@ -1128,9 +1188,9 @@ def calc_field(lmod, pbars=None, showtext=None, parent=None,
     mins = int(tdiff/60)
     secs = tdiff-mins*60
 
-    if magcalc:
+    if 'Calculated Magnetics' in dnames:
         lmod.lith_index_mag_old = np.copy(lmod.lith_index)
-    else:
+    if 'Calculated Gravity' in dnames:
         lmod.lith_index_grv_old = np.copy(lmod.lith_index)
 
     showtext('Total Time: '+str(mins)+' minutes and '+str(secs)+' seconds')
@@ -1138,34 +1198,98 @@ def calc_field(lmod, pbars=None, showtext=None, parent=None,
     return lmod.griddata
 
 
-@jit(nopython=True, parallel=True)
-def sum_fields(k, mgval, numx, numy, modind, aaa0, aaa1, mlayers, hcorflat,
-               mijk):
+def calc_field_prism(lith, xobs, yobs, zobs, x12, y12, z12, magcalc=False):
+    """
+    Calculate the field of a single rectangular prism.
+
+    The field is evaluated with the closed form expressions for the whole
+    prism, rather than by summing the fields of the voxels which make it up.
+    This is much faster for simple bodies, and is free of discretisation
+    error.
+
+    Parameters
+    ----------
+    lith : GeoData
+        Lithology with the physical properties of the prism.
+    xobs : numpy array
+        Observation X coordinates.
+    yobs : numpy array
+        Observation Y coordinates.
+    zobs : float
+        Observation Z coordinate, with z positive down.
+    x12 : list
+        Minimum and maximum x coordinates of the prism.
+    y12 : list
+        Minimum and maximum y coordinates of the prism.
+    z12 : list
+        Top and bottom z coordinates of the prism, with z positive down.
+    magcalc : bool, optional
+        if True, calculates magnetic data, otherwise only gravity. The
+        default is False.
+
+    Returns
+    -------
+    mgval : numpy array
+        Calculated field on the xobs by yobs grid, in nT or mGal.
+
+    """
+    xobs = np.asarray(xobs, dtype=float)
+    yobs = np.asarray(yobs, dtype=float)
+    numx = xobs.size
+    numy = yobs.size
+    x_1, x_2 = float(x12[0]), float(x12[1])
+    y_1, y_2 = float(y12[0]), float(y12[1])
+    z_1, z_2 = float(z12[0]), float(z12[1])
+    z_0 = float(zobs)
+
+    if magcalc:
+        mt, fmag = lith.magfactors()
+        mval1 = _mbox(np.zeros([numx, numy]), xobs, yobs, numx, numy, z_0,
+                      x_1, y_1, z_1, x_2, y_2, *fmag)
+        mval2 = _mbox(np.zeros([numx, numy]), xobs, yobs, numx, numy, z_0,
+                      x_1, y_1, z_2, x_2, y_2, *fmag)
+        return (mval1-mval2)*mt
+
+    gval = _gbox(np.zeros([numx, numy]), xobs, yobs, numx, numy, z_0, x_1,
+                 y_1, z_1, x_2, y_2, z_2, np.array([-1, 1]))
+
+    return gval*6.6732e-3*lith.rho()
+
+
+@jit(nopython=True, parallel=True, fastmath=True, cache=True)
+def sum_fields(mgval, numx, numy, isrc, jsrc, ksrc, mlayers, hcorflat,
+               sign):
     """
     Sum magnetic and gravity field datasets to produce final model field.
 
+    The source cells of a lithology are passed as separate contiguous index
+    arrays, so only cells belonging to the lithology are visited. The loop
+    is parallel over rows of observation points, so each thread owns its
+    part of the output and reads the layer fields contiguously. More than
+    one set of layer fields can be summed in the same pass. The sums are
+    added directly to the output array, so no temporary field is needed.
+
     Parameters
     ----------
-    k : int
-        k index.
     mgval : numpy array
-        DESCRIPTION.
+        Output array, which the summed data is added to, with one row per set
+        of layer fields.
     numx : int
         Number of x elements.
     numy : int
         Number of y elements.
-    modind : numpy array
-        model with indices representing lithologies.
-    aaa0 : numpy array
-        x indices for offsets.
-    aaa1 : numpy array
-        y indices for offsets.
+    isrc : numpy array
+        x indices of source cells.
+    jsrc : numpy array
+        y indices of source cells.
+    ksrc : numpy array
+        z indices of source cells.
     mlayers : numpy array
-        Layer fields for summation.
+        Sets of layer fields for summation.
     hcorflat : numpy array
         Height correction.
-    mijk : int
-        Current lithology index.
+    sign : float
+        1. to add the summed data to mgval, or -1. to subtract it.
 
     Returns
     -------
@@ -1173,21 +1297,23 @@ def sum_fields(k, mgval, numx, numy, modind, aaa0, aaa1, mlayers, hcorflat,
         Output summed data.
 
     """
-    b = numx*numy
-    for j in range(b):
-        mgval[j] = 0.
-
-    for i in range(numx):
-        xoff = numx-i
-        for j in range(numy):
-            yoff = numy-j
-            if (modind[i, j, k] != mijk):
-                continue
-            for ijk in prange(b):
-                xoff2 = xoff + aaa0[ijk]
-                yoff2 = aaa1[ijk]+yoff
-                hcor2 = hcorflat[ijk]+k
-                mgval[ijk] += mlayers[hcor2, xoff2, yoff2]
+    nsrc = isrc.size
+    numf = mlayers.shape[0]
+
+    for i in prange(numx):
+        mgrow = mgval[:, i*numy:(i+1)*numy]
+        hcrow = hcorflat[i*numy:(i+1)*numy]
+
+        for src in range(nsrc):
+            xoff = numx + i - isrc[src]
+            yoff = numy - jsrc[src]
+            k = ksrc[src]
+            mlrow = mlayers[:, :, xoff, yoff:yoff+numy]
+            for n in range(numf):
+                mgrown = mgrow[n]
+                mlrown = mlrow[n]
+                for j in range(numy):
+                    mgrown[j] += sign*mlrown[hcrow[j]+k, j]
 
     return mgval
 
@@ -1294,12 +1420,13 @@ def quick_model(numx=50, numy=40, numz=5, dxy=100., d_z=100.,
     return lmod
 
 
-@jit(nopython=True, parallel=False)
+@jit(nopython=True, parallel=True, cache=True)
 def _mbox(mval, xobs, yobs, numx, numy, z0, x1, y1, z1, x2, y2, fm1, fm2, fm3,
-          fm4, fm5, fm6, alpha, beta):
+          fm4, fm5, fm6):
     """
     Mbox routine by Blakely, continued from Geodata.mboxmain. It exists
-    in a separate function for JIT purposes.
+    in a separate function for JIT purposes. Rows of observation points are
+    calculated in parallel.
 
     Note: xobs, yobs and zobs must be floats or there will be problems
     later.
@@ -1367,10 +1494,6 @@ def _mbox(mval, xobs, yobs, numx, numy, z0, x1, y1, z1, x2, y2, fm1, fm2, fm3,
         Calculation value passed from mboxmain.
     fm6 : float
         Calculation value passed from mboxmain.
-    alpha : numpy array
-        Calculation value passed from mboxmain.
-    beta : numpy array
-        Calculation value passed from mboxmain.
 
     Returns
     -------
@@ -1379,23 +1502,28 @@ def _mbox(mval, xobs, yobs, numx, numy, z0, x1, y1, z1, x2, y2, fm1, fm2, fm3,
 
     """
     h = z1-z0
-    hsq = h**2
+    hsq = h*h
 
-    for ii in range(numx):
+    for ii in prange(numx):
+        alpha = np.empty(2)
+        beta = np.empty(2)
+        betasq = np.empty(2)
         alpha[0] = x1-xobs[ii]
         alpha[1] = x2-xobs[ii]
         for jj in range(numy):
             beta[0] = y1-yobs[jj]
             beta[1] = y2-yobs[jj]
+            betasq[0] = beta[0]*beta[0]+hsq
+            betasq[1] = beta[1]*beta[1]+hsq
             t = 0.
 
             for i in range(2):
-                alphasq = alpha[i]**2
+                alphasq = alpha[i]*alpha[i]
                 for j in range(2):
                     sign = 1.
                     if i != j:
                         sign = -1.
-                    r0sq = alphasq+beta[j]**2+hsq
+                    r0sq = alphasq+betasq[j]
                     r0 = np.sqrt(r0sq)
                     r0h = r0*h
                     alphabeta = alpha[i]*beta[j]
@@ -1415,12 +1543,13 @@ def _mbox(mval, xobs, yobs, numx, numy, z0, x1, y1, z1, x2, y2, fm1, fm2, fm3,
     return mval
 
 
-@jit(nopython=True, parallel=False)
+@jit(nopython=True, parallel=True, cache=True)
 def _gbox(gval, xobs, yobs, numx, numy, z_0, x_1, y_1, z_1, x_2, y_2, z_2,
-          x, y, z, isign):
+          isign):
     """
     Gbox routine by Blakely, continued from Geodata.gboxmain. It exists
-    in a separate function for JIT purposes.
+    in a separate function for JIT purposes. Rows of observation points are
+    calculated in parallel.
 
     Note: xobs, yobs and zobs must be floats or there will be problems
     later.
@@ -1466,12 +1595,6 @@ def _gbox(gval, xobs, yobs, numx, numy, z_0, x_1, y_1, z_1, x_2, y_2, z_2,
         Prism coordinate.
     z_2 : float
         Prism coordinate.
-    x : numpy array
-        Calculation value passed from gboxmain.
-    y : numpy array
-        Calculation value passed from gboxmain.
-    z : numpy array
-        Calculation value passed from gboxmain.
     isign : numpy array
         Calculation value passed from gboxmain.
 
@@ -1481,10 +1604,12 @@ def _gbox(gval, xobs, yobs, numx, numy, z_0, x_1, y_1, z_1, x_2, y_2, z_2,
         Calculated gravity values.
 
     """
-    z[0] = z_0-z_1
-    z[1] = z_0-z_2
+    z = np.array([z_0-z_1, z_0-z_2])
+    zsq = z*z
 
-    for ii in range(numx):
+    for ii in prange(numx):
+        x = np.empty(2)
+        y = np.empty(2)
         x[0] = xobs[ii]-x_1
         x[1] = xobs[ii]-x_2
         for jj in range(numy):
@@ -1493,10 +1618,12 @@ def _gbox(gval, xobs, yobs, numx, numy, z_0, x_1, y_1, z_1, x_2, y_2, z_2,
             sumi = 0.
             for i in range(2):
                 for j in range(2):
+                    xysq = x[i]*x[i]+y[j]*y[j]
+                    xy = x[i]*y[j]
                     for k in range(2):
-                        rijk = np.sqrt(x[i]*x[i]+y[j]*y[j]+z[k]*z[k])
+                        rijk = np.sqrt(xysq+zsq[k])
                         ijk = isign[i]*isign[j]*isign[k]
-                        arg1 = np.arctan2(x[i]*y[j], z[k]*rijk)
+                        arg1 = np.arctan2(xy, z[k]*rijk)
 
                         if arg1 < 0.:
                             arg1 = arg1 + 2 * np.pi
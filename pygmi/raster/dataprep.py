@@ -1448,30 +1448,7 @@ def fftprep(data):
     cdiff = nc//2
     rdiff = nr//2
 
-    # # Section to pad data
-
-    # nr, nc = data.data.shape
-
-    # z1 = np.zeros((nr+2*rdiff, nc+2*cdiff))-999
-    # x1, y1 = np.mgrid[0: nr+2*rdiff, 0: nc+2*cdiff]
-    # z1[rdiff:-rdiff, cdiff:-cdiff] = ndat.filled(-999)
-
-    # z1[0] = 0
-    # z1[-1] = 0
-    # z1[:, 0] = 0
-    # z1[:, -1] = 0
-
-    # x = x1.flatten()
-    # y = y1.flatten()
-    # z = z1.flatten()
-
-    # x = x[z != -999]
-    # y = y[z != -999]
-    # z = z[z != -999]
-
-    # points = np.transpose([x, y])
-
-    # zfin = si.griddata(points, z, (x1, y1), method='nearest')
+    # Section to pad data
 
     z1 = np.zeros((nr+2*rdiff, nc+2*cdiff))+np.nan
     x1, y1 = np.mgrid[0: nr+2*rdiff, 0: nc+2*cdiff]
@@ -28,10 +28,10 @@ tests.
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
 import PIL
 from pygmi.pfmod.grvmag3d import quick_model
 from pygmi.pfmod.grvmag3d import calc_field
+from pygmi.pfmod.grvmag3d import calc_field_prism
 
 
 def main():
@@ -50,6 +50,7 @@ def main():
 
     """
 
+    import matplotlib.pyplot as plt
     from IPython import get_ipython
     get_ipython().run_line_magic('matplotlib', 'inline')
 
@@ -81,18 +82,27 @@ def main():
     strikep = float(tmp[5])*scale
     striken = float(tmp[6])*scale
 
+    # Read the magnetic file once and parse the header and data from it.
     with open(ifile+'.mag') as fnr:
-        tmp = fnr.read()
+        maglines = fnr.read().splitlines()
 
-    tmp = tmp.splitlines()[2]
-    tmp = tmp.split()
+    tmp = maglines[2].split()
     finc = float(tmp[0])
     fdec = float(tmp[1])
     hintn = float(tmp[2])
 
-    mag = np.loadtxt(ifile+'.mag', skiprows=3)
-    grv = np.loadtxt(ifile+'.grv', skiprows=2)
-    body = np.loadtxt(ifile+'.sur', skiprows=7)
+    # Only read as many rows as the headers say there are.
+    mag = np.loadtxt(maglines[3:], max_rows=int(maglines[1]))
+
+    with open(ifile+'.grv') as fnr:
+        grvlines = fnr.read().splitlines()
+
+    grv = np.loadtxt(grvlines[2:], max_rows=int(grvlines[1]))
+
+    with open(ifile+'.sur') as fnr:
+        surlines = fnr.read().splitlines()
+
+    body = np.loadtxt(surlines[7:], max_rows=int(surlines[6]))
 
     x = body[:, 0] * scale
     z = -body[:, 1] * scale
@@ -107,13 +117,12 @@ def main():
     # keep things simple
     dxy = (xpos[1]-xpos[0])*samplescale
     d_z = dxy
-    ypos = np.arange(striken, strikep, dxy)
-    xpos2 = np.arange(np.min(xpos)-dxy/2, np.max(xpos)+dxy/2, dxy)
-    numx = xpos2.size
-    numy = ypos.size
+    numx = int(round((np.max(xpos)-np.min(xpos))/dxy))+1
+    numy = int(round((strikep-striken)/dxy))
     numz = int(abs(min(z)/d_z))
+    xpos2 = np.min(xpos)-dxy/2+np.arange(numx)*dxy
     tlx = np.min(xpos2)
-    tly = np.max(ypos)
+    tly = striken+(numy-1)*dxy
     tlz = 0
 
     print('Hintn (nT):', hintn)
@@ -174,9 +183,8 @@ def main():
     bline.append(tline.max())
     bline = np.array(bline)
 
-    for j in np.arange(0, (strikep-striken), dxy):
-        j2 = int(j/dxy)
-        lmod.lith_index[:, j2, :] = img[:, :].T
+    # The body is extruded along strike, so each row gets the same section.
+    lmod.lith_index[:, :numy, :] = img.T[:, np.newaxis, :]
 
     # Calculate the gravity
     calc_field(lmod)
@@ -241,6 +249,7 @@ def main():
 
     ax3.plot(x, z, 'k')
     plt.show()
+    plt.close(fig)
 
 
 def test():
@@ -269,23 +278,6 @@ def test():
     # quick model initialises a model with all the variables we have defined.
     print('')
 
-    lmod = quick_model(numx, numy, numz, dxy, d_z,
-                       tlx, tly, tlz, mht, 0, finc, fdec,
-                       ['Generic'], [susc], [dens],
-                       [minc], [mdec], [mstrength], hintn)
-
-    # Create the actual model. It is a 3 dimensional vector with '1' where the
-    # body lies
-    lmod.lith_index[45:56, :, 1:] = 1
-
-    # Calculate the gravity
-    calc_field(lmod)
-    gdata = lmod.griddata['Calculated Gravity'].data[numy//2].copy()
-
-    calc_field(lmod, magcalc=True)
-
-    mdata = lmod.griddata['Calculated Magnetics'].data[numy//2]
-
     mdata2 = np.array([-0.59099298, -0.62607842, -0.66391005, -0.70475333,
                        -0.74890404, -0.79669235, -0.84848730, -0.90470211,
                        -0.96580018, -1.03230202, -1.10479332, -1.18393415,
@@ -340,8 +332,91 @@ def test():
                        0.00882018, 0.00830052, 0.00782039, 0.00737615,
                        0.00696455])
 
-    np.testing.assert_array_almost_equal(gdata, gdata2)
-    np.testing.assert_array_almost_equal(mdata, mdata2)
+    # Check both the fused calculation and the separate gravity and
+    # magnetic calculations.
+    for both in [True, False]:
+        lmod = quick_model(numx, numy, numz, dxy, d_z,
+                           tlx, tly, tlz, mht, 0, finc, fdec,
+                           ['Generic'], [susc], [dens],
+                           [minc], [mdec], [mstrength], hintn)
+
+        # Create the actual model. It is a 3 dimensional vector with '1'
+        # where the body lies
+        lmod.lith_index[45:56, :, 1:] = 1
+
+        # Calculate the gravity and magnetics
+        if both:
+            calc_field(lmod, both=True)
+        else:
+            calc_field(lmod)
+            calc_field(lmod, magcalc=True)
+
+        gdata = lmod.griddata['Calculated Gravity'].data[numy//2]
+        mdata = lmod.griddata['Calculated Magnetics'].data[numy//2]
+
+        np.testing.assert_array_almost_equal(gdata, gdata2)
+        np.testing.assert_array_almost_equal(mdata, mdata2)
+
+
+def test_prism():
+    """
+    Test the voxel calculation against the analytic field of a prism.
+    """
+    dxy = 50.
+    d_z = 50.
+    numx = 101
+    numy = 40
+    numz = 10
+    mht = 100.
+
+    lmod = quick_model(numx, numy, numz, dxy, d_z,
+                       0, 0, 0, mht, 0, -63., -17.,
+                       ['Generic'], [0.01], [2.8],
+                       [35.], [80.], [0.199], 30000.)
+
+    lmod.lith_index[45:56, :, 1:] = 1
+    calc_field(lmod, both=True)
+
+    gdata = lmod.griddata['Calculated Gravity'].data[numy//2]
+    mdata = lmod.griddata['Calculated Magnetics'].data[numy//2]
+
+    # Observations are at the cell centres of the chosen row.
+    lith = lmod.lith_list['Generic']
+    xobs = (np.arange(numx)+0.5)*dxy
+    yobs = [(numy//2+0.5)*dxy]
+    x12 = [45*dxy, 56*dxy]
+    y12 = [0., numy*dxy]
+    z12 = [d_z, numz*d_z]
+
+    gdata2 = calc_field_prism(lith, xobs, yobs, 0., x12, y12, z12)
+    mdata2 = calc_field_prism(lith, xobs, yobs, -mht, x12, y12, z12,
+                              magcalc=True)
+
+    np.testing.assert_array_almost_equal(gdata, gdata2[:, 0])
+    np.testing.assert_array_almost_equal(mdata, mdata2[:, 0])
+
+
+def test_jobs():
+    """
+    Test that threaded calculations match the serial calculation.
+    """
+    numy = 40
+
+    out = []
+    for jobs in [1, 2, -1]:
+        lmod = quick_model(101, numy, 10, 50., 50.,
+                           0, 0, 0, 100., 0, -63., -17.,
+                           ['Generic'], [0.01], [2.8],
+                           [35.], [80.], [0.199], 30000.)
+
+        lmod.lith_index[45:56, :, 1:] = 1
+        calc_field(lmod, both=True, jobs=jobs)
+
+        out.append([lmod.griddata['Calculated Gravity'].data[numy//2],
+                    lmod.griddata['Calculated Magnetics'].data[numy//2]])
+
+    np.testing.assert_array_almost_equal(out[1], out[0])
+    np.testing.assert_array_almost_equal(out[2], out[0])
 
 
 if __name__ == "__main__":
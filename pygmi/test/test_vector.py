@@ -0,0 +1,78 @@
+# -----------------------------------------------------------------------------
+# Name:        test_vector.py (part of PyGMI)
+#
+# Author:      Patrick Cole
+# E-Mail:      pcole@geoscience.org.za
+#
+# Copyright:   (c) 2019 Council for Geoscience
+# Licence:     GPL-3.0
+#
+# This file is part of PyGMI
+#
+# PyGMI is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyGMI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+These are tests. Run pytest on this file from within this directory to do
+the tests.
+"""
+
+import sys
+from PyQt5 import QtWidgets
+import numpy as np
+from pygmi.vector import iodefs
+
+APP = QtWidgets.QApplication(sys.argv)  # Necessary to test Qt Classes
+
+
+def test_clean_names():
+    """test channel name cleaning."""
+    names = iodefs.clean_names(['X', ' Line ', 'Mag (nT)', 'mag-raw'])
+
+    assert names == ['x', 'line', 'mag_nt', 'magraw']
+
+
+def test_get_delimited(tmp_path):
+    """test import of delimited line data with comments."""
+    ifile = tmp_path/'test.csv'
+    ifile.write_text('X,Y,Mag (nT),Line\n'
+                     '# survey block A\n'
+                     '1.0,2.0,3.5,L10\n'
+                     '2.0,3.0,4.5,L10 # tie\n')
+
+    tmp = iodefs.ImportLineData()
+    tmp.ifile = str(ifile)
+    gdf = tmp.get_delimited(',')
+
+    assert list(gdf.columns) == ['x', 'y', 'mag_nt', 'line']
+    np.testing.assert_array_equal(gdf['x'], [1., 2.])
+    np.testing.assert_array_equal(gdf['y'], [2., 3.])
+    np.testing.assert_array_equal(gdf['mag_nt'], [3.5, 4.5])
+    assert list(gdf['line']) == ['l10', 'l10']
+
+
+def test_get_delimited_xyz(tmp_path):
+    """test import of space delimited line data with padded columns."""
+    ifile = tmp_path/'test.xyz'
+    ifile.write_text('x   y   mag\n'
+                     '# comment\n'
+                     '1   2   3\n'
+                     '4   5   6  # tie\n')
+
+    tmp = iodefs.ImportLineData()
+    tmp.ifile = str(ifile)
+    gdf = tmp.get_delimited(' ')
+
+    np.testing.assert_array_equal(gdf['x'], [1, 4])
+    np.testing.assert_array_equal(gdf['y'], [2, 5])
+    np.testing.assert_array_equal(gdf['mag'], [3, 6])
+    assert list(gdf['line']) == ['None', 'None']
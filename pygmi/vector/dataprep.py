@@ -29,6 +29,7 @@ import copy
 from PyQt5 import QtWidgets, QtCore, QtGui
 import numpy as np
 import matplotlib.path as mplPath
+from numba import jit
 from osgeo import osr, ogr
 import pygmi.menu_default as menu_default
 from pygmi.raster.dataprep import GroupProj
@@ -389,19 +390,13 @@ class DataGrid(QtWidgets.QDialog):
 
 # Create dataset
         dat = Data()
-        dat.data = np.ma.masked_invalid(gdat[::-1])
-        dat.data.mask = mask[::-1]
+        dat.data = np.ma.array(gdat[::-1], mask=mask[::-1])
         dat.nullvalue = nullvalue
         dat.dataid = self.dataid.currentText()
         dat.xdim = dxy
         dat.ydim = dxy
-        # dat.extent = [x.min(), x.max(), y.min(), y.max()]
 
         rows, cols = dat.data.shape
-        # left = x.min()
-        # top = y.max()
-        # right = left + dxy*cols
-        # bottom = top - dxy*rows
 
         left = x.min()
         bottom = y.min()
@@ -705,9 +700,9 @@ def quickgrid(x, y, z, dxy, numits=4, showprocesslog=print):
     """
 
     showprocesslog('Creating Grid')
-    x = x.flatten()
-    y = y.flatten()
-    z = z.flatten()
+    x = x.ravel()
+    y = y.ravel()
+    z = z.ravel()
 
     xmin = x.min()
     xmax = x.max()
@@ -734,17 +729,14 @@ def quickgrid(x, y, z, dxy, numits=4, showprocesslog=print):
         xindex = ((x-xmin)/dxy2).astype(int)
         yindex = ((y-ymin)/dxy2).astype(int)
 
-        for i in range(z.size):
-            newz[yindex[i], xindex[i]] += z[i]
-            zdiv[yindex[i], xindex[i]] += 1
+        newz, zdiv = _quickgrid_sum(newz, zdiv, xindex, yindex, z)
 
         filt = zdiv > 0
         newz[filt] = newz[filt]/zdiv[filt]
 
         if j == 0:
             newmask = np.ones([rows, cols])
-            for i in range(z.size):
-                newmask[yindex[i], xindex[i]] = 0
+            newmask[yindex, xindex] = 0
             zfin = newz
         else:
             xx, yy = newmask.nonzero()
@@ -762,6 +754,40 @@ def quickgrid(x, y, z, dxy, numits=4, showprocesslog=print):
     return newz
 
 
+@jit(nopython=True)
+def _quickgrid_sum(newz, zdiv, xindex, yindex, z):
+    """
+    Sum point values into grid cells, continued from quickgrid. It exists in
+    a separate function for JIT purposes.
+
+    Parameters
+    ----------
+    newz : numpy array
+        M x N array of summed z values.
+    zdiv : numpy array
+        M x N array of point counts per cell.
+    xindex : numpy array
+        Column index of each point.
+    yindex : numpy array
+        Row index of each point.
+    z : numpy array
+        array of z values - this is the column being gridded
+
+    Returns
+    -------
+    newz : numpy array
+        M x N array of summed z values.
+    zdiv : numpy array
+        M x N array of point counts per cell.
+
+    """
+    for i in range(z.size):
+        newz[yindex[i], xindex[i]] += z[i]
+        zdiv[yindex[i], xindex[i]] += 1
+
+    return newz, zdiv
+
+
 def testfn():
     """Main testing routine."""
     import sys
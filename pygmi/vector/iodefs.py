@@ -301,24 +301,17 @@ class ImportLineData(QtWidgets.QDialog):
 
         """
 
-        with open(self.ifile) as fno:
-            head = fno.readline()
-            tmp = fno.read()
-
-        head = head.split(delimiter)
-        head = [i.lower() for i in head]
-        tmp = tmp.lower()
+        if delimiter == ' ':
+            delimiter = r'\s+'
 
-        dtype = {}
-        dtype['names'] = head
-        dtype['formats'] = ['f4']*len(head)
+        gdf = pd.read_csv(self.ifile, sep=delimiter, comment='#',
+                          engine='c')
 
-        tmp = tmp.split('\n')
-        tmp2 = np.genfromtxt(tmp, names=head, delimiter=delimiter, dtype=None,
-                             encoding=None)
-        gdf = pd.DataFrame(tmp2)
+        gdf.columns = clean_names(gdf.columns)
+        for i in gdf.select_dtypes(include=['object', 'string']):
+            gdf[i] = gdf[i].str.strip().str.lower()
 
-        if 'line' not in head:
+        if 'line' not in gdf.columns:
             gdf['line'] = 'None'
 
         return gdf
@@ -542,3 +535,33 @@ class ImportShapeData():
         projdata['ifile'] = self.ifile
 
         return projdata
+
+
+def clean_names(names):
+    """
+    Clean channel names the same way np.genfromtxt does.
+
+    Names are lower case, with surrounding whitespace removed, spaces
+    replaced by underscores and punctuation deleted, e.g. 'Mag (nT)' becomes
+    'mag_nt'.
+
+    Parameters
+    ----------
+    names : list
+        List of channel names.
+
+    Returns
+    -------
+    names2 : list
+        List of cleaned channel names.
+
+    """
+    deletechars = set(r"""~!@#$%^&*()-=+~\|]}[{';: /?.>,<""")
+
+    names2 = []
+    for name in names:
+        name = str(name).strip().lower().replace(' ', '_')
+        name = ''.join([i for i in name if i not in deletechars])
+        names2.append(name)
+
+    return names2